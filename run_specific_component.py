@@ -9,6 +9,8 @@ from pathlib import Path
 import time
 from datetime import datetime
 
+from stock_screener.utils.helpers import ensure_dir, write_json_file
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -32,8 +34,7 @@ def run_stock_fetch():
         logger.info(f"First 10 tickers: {tickers[:10]}")
 
         # Save tickers to a file
-        results_dir = Path("component_results")
-        results_dir.mkdir(exist_ok=True)
+        results_dir = ensure_dir(Path("component_results"))
 
         date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         result_file = results_dir / f"penny_stocks_{date_str}.txt"
@@ -79,18 +80,13 @@ def run_stock_screening():
 
     # Save results to a file
     if results:
-        import json
-        from stock_screener.utils.helpers import NumpyJSONEncoder
-
-        results_dir = Path("component_results")
-        results_dir.mkdir(exist_ok=True)
+        results_dir = ensure_dir(Path("component_results"))
 
         date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         result_file = results_dir / f"screened_stocks_{date_str}.json"
 
         # Save the results
-        with open(result_file, "w") as f:
-            json.dump(results, f, cls=NumpyJSONEncoder, indent=2)
+        write_json_file(result_file, results)
 
         logger.info(f"Saved {len(results)} screened stocks to {result_file}")
 
@@ -107,38 +103,32 @@ def run_ai_analysis():
         f"Running AI analysis component with {len(sample_data)} sample stocks..."
     )
 
-    # Make copies to avoid modifying the originals
-    test_stocks = [stock.copy() for stock in sample_data]
-
-    # Run analysis
-    analyze_stocks(test_stocks)
+    # Run analysis; analyze_stocks no longer mutates its input, so the
+    # sample data can be passed directly without defensive copies
+    analysis_results = analyze_stocks(sample_data)
+    analysis_by_ticker = {r["ticker"]: r["analysis"] for r in analysis_results}
 
     # Save results to a file
-    if test_stocks:
-        import json
-        from stock_screener.utils.helpers import NumpyJSONEncoder
-
-        results_dir = Path("component_results")
-        results_dir.mkdir(exist_ok=True)
+    if sample_data:
+        results_dir = ensure_dir(Path("component_results"))
 
         date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         result_file = results_dir / f"ai_analysis_{date_str}.json"
 
         # Extract just what we need
         simplified_results = []
-        for stock in test_stocks:
+        for stock in sample_data:
             simplified_stock = {
                 "ticker": stock["ticker"],
                 "price": stock["price"],
                 "company_name": stock.get("company_name", "Unknown"),
             }
-            if "analysis" in stock:
-                simplified_stock["analysis"] = stock["analysis"]
+            if stock["ticker"] in analysis_by_ticker:
+                simplified_stock["analysis"] = analysis_by_ticker[stock["ticker"]]
             simplified_results.append(simplified_stock)
 
         # Save the results
-        with open(result_file, "w") as f:
-            json.dump(simplified_results, f, cls=NumpyJSONEncoder, indent=2)
+        write_json_file(result_file, simplified_results)
 
         logger.info(f"Saved AI analysis results to {result_file}")
 
@@ -173,8 +163,8 @@ if __name__ == "__main__":
         )
         sys.exit(1)
 
-    # Create results directory
-    Path("component_results").mkdir(exist_ok=True)
+    # Create results directory (cached, so the run_* helpers skip the re-check)
+    ensure_dir(Path("component_results"))
 
     # Run selected components
     if args.fetch:
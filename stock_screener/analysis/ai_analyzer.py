@@ -2,17 +2,43 @@
 Module for AI-powered stock analysis using Ollama with Llama 3.2 3B.
 """
 
+import atexit
+import hashlib
+import json
 import logging
 import os
+import re
+import sys
+import threading
 import requests
-from datetime import datetime
+import numpy as np
+import pandas as pd
+from collections import ChainMap
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import date
 from functools import lru_cache
-from typing import List, Dict, Any
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional; a thread pool covers concurrency without it
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    orjson = None
+
+from typing import List, Dict, Any, Optional, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential
 import asyncio  # Add asyncio import
 from ..config import settings
 from ..config.settings import RESULTS_DIR
 from ..communication.telegram_notifier import send_telegram_message, escape_markdown # Import telegram function AND the escaping helper
+from ..utils.helpers import ensure_dir
+
+# Parser for the NDJSON stream chunks; orjson decodes in C and is several
+# times faster than stdlib json on these small objects.
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -21,11 +47,265 @@ logger = logging.getLogger(__name__)
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 MODEL_NAME = os.getenv("LOCAL_LLM", "llama3:latest")
 
+# How many Ollama requests to keep in flight at once. The LLM calls are pure
+# I/O waits from Python's side, so issuing them concurrently (bounded, to
+# avoid overloading the local server) collapses N serial round-trips into
+# roughly ceil(N / OLLAMA_CONCURRENCY). Defaults to the server's own
+# OLLAMA_NUM_PARALLEL when set, so the client cap matches what the server
+# will actually run in parallel.
+OLLAMA_CONCURRENCY = int(
+    os.getenv("OLLAMA_CONCURRENCY", os.getenv("OLLAMA_NUM_PARALLEL", "8"))
+)
+
+# The prompt caps the analysis at 400 words; streaming lets us stop reading
+# (and the server stop generating for us) as soon as that budget is reached
+# instead of waiting out an overshooting generation.
+MAX_ANALYSIS_WORDS = 400
+
+# How long Ollama keeps the model (and its KV cache) resident between
+# requests; long enough to cover a whole screener batch.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "10m")
+
+# Suppress the per-stock console dump (library/scheduled use); analyses
+# still land in the markdown file and Telegram summary.
+_QUIET = os.getenv("SCREENER_QUIET", "").lower() in {"1", "true", "yes"}
+
+# Deterministic generation by default: with temperature 0 and a fixed seed,
+# identical stock data always yields the identical analysis, so the content-
+# addressed caches keep paying off across runs. Set OLLAMA_TEMPERATURE to a
+# positive value to opt back into varied wording.
+OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", "0"))
+OLLAMA_SEED = 42
+
+# Shared HTTP session for the sync path: keeps the TCP connection to the
+# local Ollama server alive instead of paying socket setup on every call.
+# The adapter pool is sized to the concurrency cap so the threaded fallback
+# never has to open (and then discard) connections beyond the pool.
+_HTTP = requests.Session()
+_HTTP.mount(
+    "http://",
+    requests.adapters.HTTPAdapter(
+        pool_connections=OLLAMA_CONCURRENCY * 2,
+        pool_maxsize=OLLAMA_CONCURRENCY * 2,
+        max_retries=0,  # tenacity owns retries; don't double up at the transport
+    ),
+)
+
+# Fallback stance line, escaped once at import rather than per stock.
+_TG_REC_NOT_FOUND = escape_markdown("Recommendation: Not Found")
+
+# Matches the line mentioning "Recommendation" and captures the first
+# non-empty line after it (the stance itself). Compiled once; a single
+# search replaces splitting and rescanning the analysis per stock.
+RECOMMENDATION_RE = re.compile(r"(?i)^[^\n]*recommendation[^\n]*\n\s*(\S[^\n]*)", re.MULTILINE)
+
+
+# Template for the formatted stock data block. %-interpolation with a dict
+# is the fastest CPython substitution path (one C call, no format-string
+# bytecode), and the text is parsed once at import time. Labels are kept
+# deliberately terse: the block is prompt-only (never shown to users), and
+# every label token is re-prefilled by the LLM for every ticker, so compact
+# key: value lines cut prefill time without dropping any field.
+_STOCK_DATA_TEMPLATE = """
+%(ticker)s (%(company_name)s) | Sector: %(sector)s | Industry: %(industry)s
+
+Fundamentals:
+Price: %(price)s | MktCap: %(market_cap)s | P/E: %(pe_ratio)s | EPS: %(eps)s | DivYield: %(dividend_yield)s
+Debt/Equity: %(debt_to_equity)s | GrossMargin: %(gross_margin_pct)s | ProfitMargin: %(profit_margin_pct)s
+CashRunway: %(cash_runway_years)s | InstOwnership: %(institutional_ownership_pct)s
+
+Technicals & Risk:
+52w Range: %(low_52w)s (%(pct_off_52w_low)s off low) - %(high_52w)s (%(pct_off_52w_high)s off high)
+Beta: %(beta)s | HistVol(60d): %(hist_volatility_60d_annualized)s | ATR Stop: %(suggested_stop_price)s (dist %(atr_stop_distance)s)
+Px>SMA20: %(price_above_sma20)s | Px>SMA50: %(price_above_sma50)s | Px>SMA200: %(price_above_sma200)s | SMA50>SMA200: %(sma50_above_sma200)s
+GoldenCross(5d): %(recent_golden_cross)s | DeathCross(5d): %(recent_death_cross)s
+RSI(14): %(rsi_14)s | MACD: %(macd_line)s / signal %(macd_signal)s / hist %(macd_hist)s
+Near52wLow: %(near_52w_low)s | Near52wHigh: %(near_52w_high)s | Breakout(60d): %(is_breaking_out_60d)s
+
+Volume & Sentiment:
+Vol: %(volume)s | AvgVol: %(avg_volume)s | AvgDollarVol: %(avg_dollar_volume)s | VolSpike(>2.5x): %(recent_volume_spike)s
+Options: %(options_metrics_str)s
+Insider(6mo): Buys %(insider_buys_count)s | NetSharesBought %(insider_net_shares)s
+
+Description:
+%(description)s
+"""
+
+# Numeric template fields and how to format them: (field, source key, kwargs
+# for format_num). Shared by the scalar and batch formatters so the two
+# paths cannot drift apart.
+_NUM_FIELD_SPECS = (
+    ("price", "price", {"precision": 2, "is_currency": True}),
+    ("volume", "volume", {"is_int": True}),
+    ("avg_volume", "avg_volume", {"is_int": True}),
+    ("avg_dollar_volume", "avg_dollar_volume", {"precision": 0, "is_currency": True}),
+    ("pe_ratio", "pe_ratio", {"precision": 2}),
+    ("eps", "eps", {"precision": 2}),
+    ("beta", "beta", {"precision": 2}),
+    ("dividend_yield", "dividend_yield", {"precision": 2, "is_pct": True}),
+    ("high_52w", "high_52w", {"precision": 2, "is_currency": True}),
+    ("low_52w", "low_52w", {"precision": 2, "is_currency": True}),
+    ("pct_off_52w_low", "pct_off_52w_low", {"precision": 1, "is_pct": True}),
+    ("pct_off_52w_high", "pct_off_52w_high", {"precision": 1, "is_pct": True}),
+    ("debt_to_equity", "debt_to_equity", {"precision": 2}),
+    ("gross_margin_pct", "gross_margin_pct", {"precision": 1, "is_pct": True}),
+    ("profit_margin_pct", "profit_margin_pct", {"precision": 1, "is_pct": True}),
+    ("institutional_ownership_pct", "institutional_ownership_pct", {"precision": 1, "is_pct": True}),
+    ("hist_volatility_60d_annualized", "hist_volatility_60d_annualized", {"precision": 1, "is_pct": True}),
+    ("insider_net_shares", "recent_insider_net_shares", {"is_int": True}),
+    ("rsi_14", "rsi_14", {"precision": 1}),
+    ("macd_line", "macd_line", {"precision": 4}),
+    ("macd_signal", "macd_signal", {"precision": 4}),
+    ("macd_hist", "macd_hist", {"precision": 4}),
+    ("atr_stop_distance", "atr_stop_distance", {"precision": 4}),
+    ("suggested_stop_price", "suggested_stop_price", {"precision": 2, "is_currency": True}),
+)
+
+# Template fields copied through as-is: (field, source key).
+_PASSTHROUGH_FIELD_SPECS = (
+    ("ticker", "ticker"),
+    ("company_name", "company_name"),
+    ("sector", "sector"),
+    ("industry", "industry"),
+    ("description", "description"),
+    ("recent_volume_spike", "recent_volume_spike"),
+    ("near_52w_low", "near_52w_low"),
+    ("near_52w_high", "near_52w_high"),
+    ("is_breaking_out_60d", "is_breaking_out_60d"),
+    ("price_above_sma20", "price_above_sma20"),
+    ("price_above_sma50", "price_above_sma50"),
+    ("price_above_sma200", "price_above_sma200"),
+    ("sma50_above_sma200", "sma50_above_sma200"),
+    ("recent_golden_cross", "recent_golden_cross"),
+    ("recent_death_cross", "recent_death_cross"),
+    ("insider_buys_count", "recent_insider_buys_count"),
+)
+
+# A stock whose formatted block is mostly N/A gives the model nothing to
+# reason about, yet would still cost a full LLM round-trip; above this many
+# missing fields the analysis is short-circuited with a canned message.
+# The +3 covers the derived market-cap/runway/options fields.
+_MAX_NA_FIELDS = int(
+    (len(_NUM_FIELD_SPECS) + len(_PASSTHROUGH_FIELD_SPECS) + 3) * 0.6
+)
+
+INSUFFICIENT_DATA_ANALYSIS = (
+    "Insufficient data for analysis: most fields are unavailable for this stock."
+)
+
+
+@lru_cache(maxsize=None)
+def _get_formatter(precision=2, is_pct=False, is_int=False, is_currency=False):
+    """Return a formatter specialized for one format_num signature.
+
+    The format spec, prefix, and suffix are resolved once per signature
+    (cached), and values dispatch on their exact type through a dict instead
+    of re-running isinstance chains per call; only unusual types (e.g. numpy
+    scalars) fall back to the isinstance check.
+    """
+    spec = ",.0f" if is_int else f",.{precision}f"
+    prefix = "$" if is_currency else ""
+    suffix = "%" if is_pct else ""
+
+    def _format_numeric(val):
+        if val != val:  # NaN (e.g. a missing cell in the batch DataFrame)
+            return "N/A"
+        try:
+            return f"{prefix}{format(val, spec)}{suffix}"
+        except (ValueError, TypeError):
+            return str(val)
+
+    dispatch = {
+        int: _format_numeric,
+        float: _format_numeric,
+        bool: _format_numeric,
+        type(None): lambda _val: "N/A",
+        str: lambda val: "N/A" if val == "N/A" else val,
+    }
+
+    def _fmt(val):
+        handler = dispatch.get(type(val))
+        if handler is not None:
+            return handler(val)
+        # numpy scalars and other numeric subclasses land here
+        if isinstance(val, (int, float)):
+            return _format_numeric(val)
+        return str(val)
+
+    return _fmt
+
+
+def format_num(val, precision=2, is_pct=False, is_int=False, is_currency=False):
+    """Format a number for display, returning 'N/A' for missing values."""
+    return _get_formatter(precision, is_pct, is_int, is_currency)(val)
+
+
+# Pre-resolved formatters for the template's numeric fields, looked up once
+# at import instead of per call.
+_NUM_FIELD_FORMATTERS = tuple(
+    (name, src, _get_formatter(**kwargs)) for name, src, kwargs in _NUM_FIELD_SPECS
+)
+
+
+def _format_cash_runway(val: Any) -> Any:
+    """Format cash runway years, handling the 'infinite runway' sentinel."""
+    if isinstance(val, (int, float)):
+        return "Positive Cash Flow" if val == float('inf') else f"{val:.1f} years"
+    return val
+
+
+def _format_options_metrics(options_metrics: Optional[Dict[str, Any]]) -> str:
+    """Render the options metrics dict as a one-line summary."""
+    if not options_metrics or options_metrics.get("error"):
+        return "No options data available."
+    pc_vol = options_metrics.get("pc_volume_ratio", "N/A")
+    pc_oi = options_metrics.get("pc_oi_ratio", "N/A")
+    avg_iv_num = options_metrics.get("average_iv")
+    avg_iv = f"{avg_iv_num * 100:.1f}%" if isinstance(avg_iv_num, (int, float)) else 'N/A'
+    return (
+        f"Put/Call Vol Ratio: {pc_vol}, "
+        f"Put/Call OI Ratio: {pc_oi}, "
+        f"Avg Near-Term IV: {avg_iv}"
+    )
+
+
+# All stock-dict keys the formatter reads; anything else can change without
+# affecting the output, so the cache key is restricted to these.
+_RELEVANT_KEYS = frozenset(
+    [src for _, src in _PASSTHROUGH_FIELD_SPECS]
+    + [src for _, src, _ in _NUM_FIELD_SPECS]
+    + ["market_cap", "cash_runway_years", "options_metrics"]
+)
+
+
+def _freeze(value: Any) -> Any:
+    """Convert a value into a hashable equivalent for cache keying."""
+    if isinstance(value, dict):
+        return ("__dict__", tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return ("__list__", tuple(_freeze(v) for v in value))
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of _freeze."""
+    if isinstance(value, tuple) and len(value) == 2:
+        tag, items = value
+        if tag == "__dict__":
+            return {k: _thaw(v) for k, v in items}
+        if tag == "__list__":
+            return [_thaw(v) for v in items]
+    return value
+
 
 def format_stock_data(stock: Dict[str, Any]) -> str:
     """
     Format stock data for Llama analysis, including enhanced financial and technical metrics.
 
+    The result is memoized on the relevant fields, so re-analyzing the same
+    stock within a process (e.g. repeated --analyze runs) skips the
+    formatting work entirely.
+
     Args:
         stock: Stock data dictionary
 
@@ -33,200 +313,140 @@ def format_stock_data(stock: Dict[str, Any]) -> str:
         Formatted string with stock data
     """
     try:
-        # --- Financials & Basic Info ---
-        ticker = stock.get("ticker", "N/A")
-        company_name = stock.get("company_name", "N/A")
-        sector = stock.get("sector", "N/A")
-        industry = stock.get("industry", "N/A")
-        price = stock.get("price", "N/A")
-        market_cap = stock.get("market_cap", "N/A")
-        pe_ratio = stock.get("pe_ratio", "N/A")
-        eps = stock.get("eps", "N/A")
-        dividend_yield = stock.get("dividend_yield", "N/A")
-        beta = stock.get("beta", "N/A")
-        debt_to_equity = stock.get('debt_to_equity', 'N/A')
-        gross_margin_pct = stock.get('gross_margin_pct', 'N/A')
-        profit_margin_pct = stock.get('profit_margin_pct', 'N/A')
-        cash_runway_years = stock.get('cash_runway_years', 'N/A')
-        institutional_ownership_pct = stock.get('institutional_ownership_pct', 'N/A')
-        description = stock.get("description", "N/A")
-
-        # --- Volume & Volatility ---
-        volume = stock.get("volume", "N/A")
-        avg_volume = stock.get("avg_volume", "N/A")
-        avg_dollar_volume = stock.get('avg_dollar_volume', 'N/A')
-        hist_volatility_60d_annualized = stock.get('hist_volatility_60d_annualized', 'N/A')
-        recent_volume_spike = stock.get('recent_volume_spike', 'N/A')
-
-        # --- Price Action & Levels ---
-        high_52w = stock.get("high_52w", "N/A")
-        low_52w = stock.get("low_52w", "N/A")
-        pct_off_52w_low = stock.get('pct_off_52w_low', 'N/A')
-        pct_off_52w_high = stock.get('pct_off_52w_high', 'N/A')
-        near_52w_low = stock.get('near_52w_low', 'N/A')
-        near_52w_high = stock.get('near_52w_high', 'N/A')
-        is_breaking_out_60d = stock.get('is_breaking_out_60d', 'N/A')
-        atr_stop_distance = stock.get('atr_stop_distance', 'N/A')
-        suggested_stop_price = stock.get('suggested_stop_price', 'N/A')
-
-        # --- Moving Averages & Momentum ---
-        rsi_14 = stock.get('rsi_14', 'N/A')
-        macd_line = stock.get('macd_line', 'N/A')
-        macd_signal = stock.get('macd_signal', 'N/A')
-        macd_hist = stock.get('macd_hist', 'N/A')
-        sma_20 = stock.get('sma_20', 'N/A')
-        sma_50 = stock.get('sma_50', 'N/A')
-        sma_200 = stock.get('sma_200', 'N/A')
-        price_above_sma20 = stock.get('price_above_sma20', 'N/A')
-        price_above_sma50 = stock.get('price_above_sma50', 'N/A')
-        price_above_sma200 = stock.get('price_above_sma200', 'N/A')
-        sma50_above_sma200 = stock.get('sma50_above_sma200', 'N/A')
-        recent_golden_cross = stock.get('recent_golden_cross', 'N/A')
-        recent_death_cross = stock.get('recent_death_cross', 'N/A')
-
-        # --- Sentiment & Insiders ---
-        insider_buys_count = stock.get('recent_insider_buys_count', 'N/A')
-        insider_net_shares = stock.get('recent_insider_net_shares', 'N/A')
-        options_metrics = stock.get("options_metrics")
-
-        # --- Formatting Logic ---
-        # Format options metrics if available
-        options_metrics_str = "No options data available."
-        if options_metrics and not options_metrics.get("error"):
-            pc_vol = options_metrics.get("pc_volume_ratio", "N/A")
-            pc_oi = options_metrics.get("pc_oi_ratio", "N/A")
-            avg_iv_num = options_metrics.get("average_iv")
-            avg_iv = f"{avg_iv_num * 100:.1f}%" if isinstance(avg_iv_num, (int, float)) else 'N/A'
-            options_metrics_str = (
-                f"Put/Call Vol Ratio: {pc_vol}, "
-                f"Put/Call OI Ratio: {pc_oi}, "
-                f"Avg Near-Term IV: {avg_iv}"
-            )
+        key = tuple(
+            sorted((k, _freeze(stock[k])) for k in _RELEVANT_KEYS if k in stock)
+        )
+        return _format_stock_data_cached(key)
+    except TypeError:
+        # Unhashable value somewhere in the dict; format without caching
+        return _format_stock_data_uncached(stock)
+
+
+@lru_cache(maxsize=512)
+def _format_stock_data_cached(frozen_items: tuple) -> str:
+    return _format_stock_data_uncached({k: _thaw(v) for k, v in frozen_items})
 
-        # Helper function for formatting numbers or returning 'N/A'
-        def format_num(val, precision=2, is_pct=False, is_int=False, is_currency=False):
-            if val is None or val == 'N/A': return 'N/A'
-            if not isinstance(val, (int, float)): return str(val)
-            try:
-                if is_int: formatted_num = f"{val:,.0f}"
-                else: formatted_num = f"{val:,.{precision}f}"
-                
-                if is_currency: return f"${formatted_num}"
-                if is_pct: return f"{formatted_num}%"
-                return formatted_num
-            except (ValueError, TypeError):
-                return str(val)
-
-        # Format numbers for readability
-        price = format_num(price, 2, is_currency=True)
-        market_cap_str = "N/A"
-        if isinstance(market_cap, (int, float)):
-            if market_cap >= 1_000_000_000: market_cap_str = f"${market_cap/1_000_000_000:.2f}B"
-            elif market_cap >= 1_000_000: market_cap_str = f"${market_cap/1_000_000:.2f}M"
-            else: market_cap_str = f"${market_cap:,.0f}"
-        market_cap = market_cap_str # Overwrite with formatted string
-        
-        volume = format_num(volume, is_int=True)
-        avg_volume = format_num(avg_volume, is_int=True)
-        avg_dollar_volume = format_num(avg_dollar_volume, 0, is_currency=True)
-        pe_ratio = format_num(pe_ratio, 2)
-        eps = format_num(eps, 2)
-        beta = format_num(beta, 2)
-        dividend_yield = format_num(dividend_yield, 2, is_pct=True)
-        high_52w = format_num(high_52w, 2, is_currency=True)
-        low_52w = format_num(low_52w, 2, is_currency=True)
-        pct_off_52w_low = format_num(pct_off_52w_low, 1, is_pct=True)
-        pct_off_52w_high = format_num(pct_off_52w_high, 1, is_pct=True)
-        
-        debt_to_equity = format_num(debt_to_equity, 2)
-        gross_margin_pct = format_num(gross_margin_pct, 1, is_pct=True)
-        profit_margin_pct = format_num(profit_margin_pct, 1, is_pct=True)
-        if isinstance(cash_runway_years, (int, float)):
-            cash_runway_years = "Positive Cash Flow" if cash_runway_years == float('inf') else f"{cash_runway_years:.1f} years"
-        insider_net_shares = format_num(insider_net_shares, is_int=True)
-        institutional_ownership_pct = format_num(institutional_ownership_pct, 1, is_pct=True)
-        hist_volatility_60d_annualized = format_num(hist_volatility_60d_annualized, 1, is_pct=True)
-        
-        rsi_14 = format_num(rsi_14, 1)
-        macd_line = format_num(macd_line, 4)
-        macd_signal = format_num(macd_signal, 4)
-        macd_hist = format_num(macd_hist, 4)
-        sma_20 = format_num(sma_20, 2)
-        sma_50 = format_num(sma_50, 2)
-        sma_200 = format_num(sma_200, 2)
-        atr_stop_distance = format_num(atr_stop_distance, 4)
-        suggested_stop_price = format_num(suggested_stop_price, 2, is_currency=True)
-
-        # Construct the formatted string with updated sections
-        data_str = f"""
-Ticker: {ticker} ({company_name})
-Sector: {sector} | Industry: {industry}
-
-Key Financials & Fundamentals:
-Price: {price}
-Market Cap: {market_cap}
-P/E Ratio: {pe_ratio}
-EPS: {eps}
-Dividend Yield: {dividend_yield}
-Debt/Equity Ratio: {debt_to_equity}
-Gross Margin: {gross_margin_pct}
-Profit Margin: {profit_margin_pct}
-Cash Runway: {cash_runway_years}
-Institutional Ownership: {institutional_ownership_pct}
-
-Technical Indicators & Risk:
-52-Week Range: {low_52w} ({pct_off_52w_low} from Low) - {high_52w} ({pct_off_52w_high} from High)
-Beta (Market Volatility): {beta}
-Historical Volatility (60d Ann.): {hist_volatility_60d_annualized}
-ATR Stop Price (Suggested): {suggested_stop_price} (Distance: {atr_stop_distance})
-Price vs SMA(20): {price_above_sma20} | Price vs SMA(50): {price_above_sma50} | Price vs SMA(200): {price_above_sma200}
-SMA(50) vs SMA(200): {sma50_above_sma200}
-Recent Golden Cross (5d): {recent_golden_cross} | Recent Death Cross (5d): {recent_death_cross}
-RSI(14): {rsi_14}
-MACD Line: {macd_line} | Signal: {macd_signal} | Hist: {macd_hist}
-Near 52w Low: {near_52w_low} | Near 52w High: {near_52w_high}
-Breaking Out (60d High): {is_breaking_out_60d}
-
-Volume, Liquidity & Sentiment:
-Today's Volume: {volume}
-Average Volume: {avg_volume}
-Average Dollar Volume: {avg_dollar_volume}
-Recent Volume Spike (>2.5x Avg): {recent_volume_spike}
-Options Sentiment: {options_metrics_str}
-Insider Activity (Last 6 Mo): Recent Buys: {insider_buys_count} | Net Shares Purchased: {insider_net_shares}
-
-Company Description:
-{description}
-"""
-        return data_str.strip()
+
+def _format_stock_data_uncached(stock: Dict[str, Any]) -> str:
+    try:
+        # Bind the bound method once; ~40 LOAD_METHOD lookups per stock
+        # otherwise
+        get = stock.get
+        # Explicit None/NaN render as "N/A" like a missing key, matching the
+        # batch path's notna() mask so both paths emit identical prompts
+        # (v == v is the NaN check, as in the numeric formatters)
+        fields = {
+            name: v if (v := get(src)) is not None and v == v else "N/A"
+            for name, src in _PASSTHROUGH_FIELD_SPECS
+        }
+        for name, src, fmt in _NUM_FIELD_FORMATTERS:
+            fields[name] = fmt(get(src, "N/A"))
+
+        fields["market_cap"] = format_market_cap(get("market_cap"))
+        fields["cash_runway_years"] = _format_cash_runway(get("cash_runway_years", "N/A"))
+        fields["options_metrics_str"] = _format_options_metrics(get("options_metrics"))
+
+        return (_STOCK_DATA_TEMPLATE % fields).strip()
 
     except Exception as e:
-        logger.error(f"Error formatting stock data: {e}")
+        logger.error("Error formatting stock data: %s", e)
         return ""
 
 
-@lru_cache(maxsize=128)
-@retry(
-    stop=stop_after_attempt(3),  # Default to 3 retries for LLM
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-)
-def generate_analysis(stock_data_str: str, ticker: str) -> str:
-    """Generate an analysis for a stock using Llama 3.2 3B, with retry logic.
+def format_market_cap(market_cap: Any) -> str:
+    """Format a market cap into $B/$M notation, or 'N/A' if not numeric."""
+    if isinstance(market_cap, (int, float)):
+        if market_cap >= 1_000_000_000: return f"${market_cap/1_000_000_000:.2f}B"
+        elif market_cap >= 1_000_000: return f"${market_cap/1_000_000:.2f}M"
+        else: return f"${market_cap:,.0f}"
+    return "N/A"
+
+
+def format_stock_data_batch(stocks: List[Dict[str, Any]]) -> List[str]:
+    """
+    Format many stocks at once using column-wise pandas/NumPy operations.
+
+    Vectorizing the numeric formatting moves the per-field Python work out of
+    the per-stock loop: each column is converted and formatted once for the
+    whole batch (np.select for the market-cap branching), and only the final
+    template substitution runs per stock.
 
     Args:
-        stock_data_str: Formatted string with stock data
-        ticker: Stock ticker
+        stocks: List of stock data dictionaries
 
     Returns:
-        Generated analysis text
+        One formatted string per stock, in input order
     """
-    logger.info(f"Generating analysis for {ticker}")
+    if not stocks:
+        return []
 
     try:
-        # Updated prompt to explicitly mention risk/liquidity metrics
-        prompt = f"""Analyze this stock based on the provided data:
+        # Project each dict down to the keys the template consumes before
+        # handing it to pandas; full stock dicts can drag along large nested
+        # payloads (price history, option chains) that would otherwise
+        # become object columns the formatter never reads. dtype=object
+        # keeps the original Python scalars: letting pandas infer dtypes
+        # would upcast int columns with any missing entry to float64 and
+        # render e.g. "Buys 3" as "Buys 3.0", diverging from the scalar path.
+        df = pd.DataFrame(
+            [{k: stock[k] for k in _RELEVANT_KEYS if k in stock} for stock in stocks],
+            dtype=object,
+        )
 
-{stock_data_str}
+        out = pd.DataFrame(index=df.index)
+        for name, src in _PASSTHROUGH_FIELD_SPECS:
+            if src in df.columns:
+                out[name] = df[src].astype(object).where(df[src].notna(), "N/A")
+            else:
+                out[name] = "N/A"
+
+        for name, src, fmt in _NUM_FIELD_FORMATTERS:
+            if src in df.columns:
+                out[name] = df[src].map(fmt)
+            else:
+                out[name] = "N/A"
+
+        # Vectorized market-cap branching across the whole batch
+        if "market_cap" in df.columns:
+            mc = pd.to_numeric(df["market_cap"], errors="coerce")
+            out["market_cap"] = np.select(
+                [mc >= 1e9, mc >= 1e6, mc.notna()],
+                [
+                    (mc / 1e9).map("${:.2f}B".format),
+                    (mc / 1e6).map("${:.2f}M".format),
+                    mc.fillna(0).map("${:,.0f}".format),
+                ],
+                default="N/A",
+            )
+        else:
+            out["market_cap"] = "N/A"
+
+        if "cash_runway_years" in df.columns:
+            out["cash_runway_years"] = df["cash_runway_years"].map(_format_cash_runway).where(df["cash_runway_years"].notna(), "N/A")
+        else:
+            out["cash_runway_years"] = "N/A"
+        if "options_metrics" in df.columns:
+            out["options_metrics_str"] = df["options_metrics"].map(_format_options_metrics)
+        else:
+            out["options_metrics_str"] = "No options data available."
+
+        return [
+            (_STOCK_DATA_TEMPLATE % row).strip()
+            for row in out.to_dict("records")
+        ]
+
+    except Exception as e:
+        logger.error("Error batch-formatting stock data: %s", e)
+        # Fall back to the scalar path so one bad column can't sink the batch
+        return [format_stock_data(stock) for stock in stocks]
+
+
+# Static analysis instructions, sent via the Ollama "system" field. Only the
+# stock data varies per request, so with keep_alive holding the model
+# resident Ollama can reuse the KV cache for this shared prefix instead of
+# re-prefilling it for every ticker.
+# Updated prompt to explicitly mention risk/liquidity metrics
+_SYSTEM_PROMPT = """Analyze the stock based on the data provided by the user.
 
 Provide a CONCISE investment analysis including:
 1. Technical Analysis: Consider RSI, MACD, MA relationships (Price vs MAs, 50 vs 200, crossovers), volume patterns, and price action relative to 52w levels and recent breakouts. Also mention the suggested ATR Stop Price. (3-4 bullet points)
@@ -242,107 +462,498 @@ IMPORTANT: Be extremely concise. Use short sentences. Avoid lengthy explanations
 Max 400 words.
 """
 
-        # Call Llama through Ollama API
-        response = requests.post(
+
+def _build_payload(stock_data_str: str) -> Dict[str, Any]:
+    """Build the Ollama request body for a formatted stock data block."""
+    return {
+        "model": MODEL_NAME,
+        "system": _SYSTEM_PROMPT,
+        "prompt": stock_data_str,
+        "stream": True,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        # num_predict caps generation server-side (Ollama ignores the OpenAI
+        # "max_tokens" name): the prompt limits answers to 400 words, about
+        # 550 tokens, so 600 leaves headroom without paying for 800-token
+        # overruns. num_ctx is sized for system prompt + one stock block +
+        # the capped answer; a smaller KV cache leaves room to raise
+        # OLLAMA_NUM_PARALLEL. The stop sequence cuts off runaway blank-line
+        # padding after the analysis.
+        "options": {
+            "temperature": OLLAMA_TEMPERATURE,
+            "seed": OLLAMA_SEED,
+            "num_ctx": 1536,
+            "num_predict": 600,
+            "stop": ["\n\n\n"],
+        },
+    }
+
+
+# Completed analyses keyed by a 16-byte BLAKE2b digest of the model name,
+# system prompt, and formatted stock data (so prompt or model changes
+# invalidate cleanly). Hashing once up front is cheaper than lru_cache
+# re-hashing the multi-KB prompt string on every probe, the plain dict has
+# no internal lock to contend on under the threaded/async executors, and
+# both call paths (sync and async) share the same entries. Entries are
+# mirrored to disk so repeat runs on the same day's data skip the LLM
+# entirely. Errors are never cached.
+_ANALYSIS_CACHE: Dict[str, str] = {}
+
+_LLM_CACHE_DIR = RESULTS_DIR / ".llm_cache"
+
+
+def _analysis_cache_key(stock_data_str: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(MODEL_NAME.encode())
+    h.update(_SYSTEM_PROMPT.encode())
+    h.update(stock_data_str.encode())
+    return h.hexdigest()
+
+
+def _analysis_cache_get(cache_key: str) -> Optional[str]:
+    """Probe the in-memory tier, then the on-disk tier."""
+    cached = _ANALYSIS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        cached = (_LLM_CACHE_DIR / f"{cache_key}.txt").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    _ANALYSIS_CACHE[cache_key] = cached
+    return cached
+
+
+def _analysis_cache_put(cache_key: str, analysis: str) -> None:
+    """Store a finished analysis in both cache tiers.
+
+    The disk write goes through a temp file plus os.replace so concurrent
+    workers finishing the same key can never leave a half-written entry for
+    a later run to read back.
+    """
+    _ANALYSIS_CACHE[cache_key] = analysis
+    try:
+        ensure_dir(_LLM_CACHE_DIR)
+        path = _LLM_CACHE_DIR / f"{cache_key}.txt"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(analysis, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not persist analysis to disk cache: %s", e)
+
+
+# Second-level cache mapping a cheap (ticker, price, rsi_14) key straight to
+# the finished analysis. A hit skips both the formatting work and the LLM
+# call — the digest cache above can only be probed after formatting. Mostly
+# pays off when --analyze is re-run over the same day's data in one process.
+_QUICK_ANALYSIS_CACHE: Dict[tuple, str] = {}
+
+
+def _quick_analysis_key(stock: Dict[str, Any]) -> tuple:
+    price = stock.get("price")
+    rsi = stock.get("rsi_14")
+    return (
+        stock.get("ticker", "unknown"),
+        round(price, 2) if isinstance(price, (int, float)) else None,
+        round(rsi, 1) if isinstance(rsi, (int, float)) else None,
+    )
+
+
+def preload_model() -> None:
+    """Start loading the Ollama model in the background.
+
+    An empty prompt makes Ollama pull the weights into memory (held for
+    OLLAMA_KEEP_ALIVE) without generating anything. Fired on a daemon
+    thread from the top of a screener run, the multi-second model load
+    overlaps the data-fetch and screening phase instead of being paid as
+    first-token latency by the first analysis. Failures are harmless — the
+    first real request just loads the model itself.
+    """
+    def _load():
+        try:
+            _HTTP.post(
+                OLLAMA_API_URL,
+                json={
+                    "model": MODEL_NAME,
+                    "prompt": "",
+                    "keep_alive": OLLAMA_KEEP_ALIVE,
+                },
+                timeout=(3, 300),
+            ).close()
+            logger.info("Ollama model %s preloaded", MODEL_NAME)
+        except Exception as e:
+            logger.debug("Ollama model preload skipped: %s", e)
+
+    threading.Thread(target=_load, name="ollama-preload", daemon=True).start()
+
+
+def generate_analysis(stock_data_str: str, ticker: str) -> str:
+    """Generate an analysis for a stock using Llama 3.2 3B, with retry logic.
+
+    The cache probe lives outside the retried helper so hits return without
+    touching tenacity's attempt state machine.
+
+    Args:
+        stock_data_str: Formatted string with stock data
+        ticker: Stock ticker
+
+    Returns:
+        Generated analysis text
+    """
+    cache_key = _analysis_cache_key(stock_data_str)
+    cached = _analysis_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    return _generate_analysis_uncached(stock_data_str, ticker, cache_key)
+
+
+@retry(
+    stop=stop_after_attempt(3),  # Default to 3 retries for LLM
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+)
+def _generate_analysis_uncached(stock_data_str: str, ticker: str, cache_key: str) -> str:
+    logger.info("Generating analysis for %s", ticker)
+
+    try:
+        # Call Llama through Ollama API, streaming so we can stop at the word cap
+        response = _HTTP.post(
             OLLAMA_API_URL,
-            json={
-                "model": MODEL_NAME,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.7, "max_tokens": 800},
-            },
+            json=_build_payload(stock_data_str),
+            stream=True,
+            # Fail fast on connect (server down) but allow a long read for
+            # the generation itself
+            timeout=(3, 120),
         )
 
         if response.status_code != 200:
             raise Exception(f"Ollama API error: {response.text}")
 
-        analysis = response.json()["response"].strip()
+        try:
+            parts, word_count = [], 0
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                piece = chunk.get("response", "")
+                if piece:
+                    parts.append(piece)
+                    word_count += piece.count(" ")
+                if chunk.get("done") or word_count >= MAX_ANALYSIS_WORDS:
+                    break
+        finally:
+            response.close()
+
+        analysis = "".join(parts).strip()
+        _analysis_cache_put(cache_key, analysis)
         return analysis
 
     except Exception as e:
-        logger.error(f"Error generating analysis for {ticker}: {e}")
+        logger.error("Error generating analysis for %s: %s", ticker, e)
         return f"Error: Could not generate analysis for {ticker}. {str(e)}"
 
 
-def analyze_stocks(stocks: List[Dict[str, Any]], screener_name: str, analysis_file_prefix: str) -> None:
+async def generate_analysis_async(
+    session: "aiohttp.ClientSession",
+    semaphore: asyncio.Semaphore,
+    stock_data_str: str,
+    ticker: str,
+) -> str:
+    """Async counterpart of generate_analysis, sharing one HTTP session.
+
+    Args:
+        session: Shared aiohttp session (connection pooling across calls)
+        semaphore: Caps in-flight requests so Ollama isn't overloaded
+        stock_data_str: Formatted string with stock data
+        ticker: Stock ticker
+
+    Returns:
+        Generated analysis text
+    """
+    cache_key = _analysis_cache_key(stock_data_str)
+    cached = _analysis_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    return await _generate_analysis_async_uncached(
+        session, semaphore, stock_data_str, ticker, cache_key
+    )
+
+
+@retry(
+    stop=stop_after_attempt(3),  # Default to 3 retries for LLM
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+)
+async def _generate_analysis_async_uncached(
+    session: "aiohttp.ClientSession",
+    semaphore: asyncio.Semaphore,
+    stock_data_str: str,
+    ticker: str,
+    cache_key: str,
+) -> str:
+    logger.info("Generating analysis for %s", ticker)
+
+    async with semaphore:
+        async with session.post(
+            OLLAMA_API_URL,
+            json=_build_payload(stock_data_str),
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Ollama API error: {await response.text()}")
+
+            parts, word_count = [], 0
+            async for line in response.content:
+                line = line.strip()
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                piece = chunk.get("response", "")
+                if piece:
+                    parts.append(piece)
+                    word_count += piece.count(" ")
+                if chunk.get("done") or word_count >= MAX_ANALYSIS_WORDS:
+                    break
+
+    analysis = "".join(parts).strip()
+    _analysis_cache_put(cache_key, analysis)
+    return analysis
+
+
+async def _generate_analyses(jobs: List[Tuple[str, str]]) -> List[str]:
+    """Run generate_analysis_async concurrently for (stock_data_str, ticker) jobs.
+
+    Returns one analysis string per job, in the same order. Failures are
+    mapped to the same error text the sync path produces.
+    """
+    semaphore = asyncio.Semaphore(OLLAMA_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=OLLAMA_CONCURRENCY * 2, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [
+            generate_analysis_async(session, semaphore, stock_data_str, ticker)
+            for stock_data_str, ticker in jobs
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    analyses = []
+    for (_, ticker), result in zip(jobs, results):
+        if isinstance(result, BaseException):
+            logger.error("Error generating analysis for %s: %s", ticker, result)
+            analyses.append(
+                f"Error: Could not generate analysis for {ticker}. {str(result)}"
+            )
+        else:
+            analyses.append(result)
+    return analyses
+
+
+def _generate_analyses_threaded(jobs: List[Tuple[str, str]]) -> List[str]:
+    """Thread-pool fallback for _generate_analyses when aiohttp is missing.
+
+    requests.post releases the GIL while waiting on the socket, so a small
+    pool still overlaps the Ollama round-trips. Results come back in job
+    order with the same error mapping as the async path.
+    """
+    analyses = [""] * len(jobs)
+    with ThreadPoolExecutor(max_workers=OLLAMA_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(generate_analysis, stock_data_str, ticker): i
+            for i, (stock_data_str, ticker) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            _, ticker = jobs[i]
+            try:
+                analyses[i] = future.result()
+            except Exception as e:
+                logger.error("Error generating analysis for %s: %s", ticker, e)
+                analyses[i] = f"Error: Could not generate analysis for {ticker}. {str(e)}"
+    return analyses
+
+
+def analyze_stocks(
+    stocks: List[Dict[str, Any]],
+    screener_name: str = "Stock",
+    analysis_file_prefix: str = "stocks",
+) -> List[Dict[str, str]]:
     """
     Analyze a list of stocks using Llama 3.2 3B.
 
+    The input dicts are not modified; each stock's analysis is returned so
+    callers that want it attached can merge it themselves, without having to
+    make defensive copies first.
+
     Args:
         stocks: List of stock data dictionaries
         screener_name: Name of the screener (e.g., "Penny Stock", "Normal Stock") for titling.
         analysis_file_prefix: Prefix for the output file (e.g., "penny_stocks", "normal_stocks").
+
+    Returns:
+        List of {"ticker", "analysis"} dicts, one per analyzed stock.
     """
     if not stocks:
-        logger.warning(f"No stocks provided from {screener_name} screener for analysis")
-        return
+        logger.warning("No stocks provided from %s screener for analysis", screener_name)
+        return []
 
-    # Analyze each stock
-    stocks_analyzed = []
+    # Probe the quick cache first: hits don't even need to be formatted.
+    # Only the misses go through batch formatting and the LLM requests,
+    # which then run concurrently (Ollama latency dominates).
+    quick_keys = [_quick_analysis_key(stock) for stock in stocks]
+    miss_indices = [
+        i for i, key in enumerate(quick_keys) if key not in _QUICK_ANALYSIS_CACHE
+    ]
+    data_strs = dict(
+        zip(miss_indices, format_stock_data_batch([stocks[i] for i in miss_indices]))
+    )
 
+    jobs = []
+    job_index_by_key = {}  # prompt digest -> job index, to dedupe identical prompts
+    pending = []  # (stock, cached analysis or None, job_index or None)
+    total = len(stocks)
     for i, stock in enumerate(stocks):
+        ticker = stock.get("ticker", "unknown")
+        logger.info("[%d/%d] Analyzing %s (%s screener)", i + 1, total, ticker, screener_name)
+        if i not in data_strs:
+            pending.append((stock, _QUICK_ANALYSIS_CACHE[quick_keys[i]], None))
+            continue
+        stock_data_str = data_strs[i]
+        if not stock_data_str:
+            pending.append((stock, "Error: Could not format stock data.", None))
+        elif stock_data_str.count("N/A") > _MAX_NA_FIELDS:
+            # Mostly-missing data: skip the LLM round-trip entirely
+            pending.append((stock, INSUFFICIENT_DATA_ANALYSIS, None))
+        else:
+            # Stocks that format to byte-identical prompts (duplicate rows
+            # from overlapping screens) share one LLM call
+            key = _analysis_cache_key(stock_data_str)
+            job_index = job_index_by_key.get(key)
+            if job_index is None:
+                job_index = job_index_by_key[key] = len(jobs)
+                jobs.append((stock_data_str, ticker))
+            pending.append((stock, None, job_index))
+
+    if not jobs:
+        analyses = []
+    elif aiohttp is not None:
+        analyses = asyncio.run(_generate_analyses(jobs))
+    else:
+        analyses = _generate_analyses_threaded(jobs)
+
+    stocks_analyzed = []
+    results = []
+
+    for stock, analysis, job_index in pending:
         try:
             ticker = stock.get("ticker", "unknown")
             company_name = stock.get("company_name", "")
-            logger.info(f"[{i+1}/{len(stocks)}] Analyzing {ticker} ({screener_name} screener)")
 
-            # Generate analysis
-            stock_data_str = format_stock_data(stock)
-            if not stock_data_str:
-                analysis = "Error: Could not format stock data."
-            else:
-                analysis = generate_analysis(stock_data_str, ticker)
-
-            # Add analysis to the stock data
-            stock["analysis"] = analysis
-            stocks_analyzed.append(stock)
-
-            # Print analysis for visibility with better formatting
-            print(f"\nAnalysis for {ticker}")
-            print("=" * 80)
-
-            # Print a summary of key metrics before the analysis
-            price = stock.get("price", "N/A")
-            # Format price directly here for printing
-            if isinstance(price, (int, float)):
-                price = f"${price:.2f}"
-                
-            market_cap = stock.get("market_cap", "N/A")
-            if isinstance(market_cap, (int, float)) and market_cap > 0:
-                if market_cap >= 1_000_000_000:
-                    market_cap = f"${market_cap/1_000_000_000:.2f}B"
-                elif market_cap >= 1_000_000:
-                    market_cap = f"${market_cap/1_000_000:.2f}M"
-                else:
-                    market_cap = f"${market_cap:,.0f}"
+            if analysis is None:
+                analysis = analyses[job_index]
+                if not analysis.startswith("Error"):
+                    _QUICK_ANALYSIS_CACHE[_quick_analysis_key(stock)] = analysis
 
-            pe_ratio = stock.get("pe_ratio", "N/A")
-            eps = stock.get("eps", "N/A")
+            # Overlay the analysis on the stock without mutating or copying
+            # it; ChainMap reads fall through to the original dict.
+            results.append({"ticker": ticker, "analysis": analysis})
+            stocks_analyzed.append(ChainMap({"analysis": analysis}, stock))
 
-            if company_name:
-                ticker_display = f"{ticker} - {company_name}"
-            else:
-                ticker_display = ticker
+            if not _QUIET:
+                # Print analysis for visibility with better formatting,
+                # reusing the shared formatters instead of duplicating their
+                # branching here. One write per stock instead of six print
+                # calls keeps stdout lock/flush churn off the hot loop.
+                price = stock.get("price", "N/A")
+                if isinstance(price, (int, float)):
+                    price = format_num(price, 2, is_currency=True)
 
-            print(f"Stock: {ticker_display}")
-            print(
-                f"Price: {price} | Market Cap: {market_cap} | "
-                f"P/E: {pe_ratio} | EPS: {eps}"
-            )
-            print("-" * 80)
+                market_cap = format_market_cap(stock.get("market_cap"))
 
-            # Print the analysis with proper line breaks
-            print(analysis)
-            print("=" * 80)
+                pe_ratio = stock.get("pe_ratio", "N/A")
+                eps = stock.get("eps", "N/A")
+
+                if company_name:
+                    ticker_display = f"{ticker} - {company_name}"
+                else:
+                    ticker_display = ticker
+
+                sys.stdout.write(
+                    f"\nAnalysis for {ticker}\n"
+                    f"{'=' * 80}\n"
+                    f"Stock: {ticker_display}\n"
+                    f"Price: {price} | Market Cap: {market_cap} | "
+                    f"P/E: {pe_ratio} | EPS: {eps}\n"
+                    f"{'-' * 80}\n"
+                    f"{analysis}\n"
+                    f"{'=' * 80}\n"
+                )
 
         except Exception as e:
-            logger.error(f"Error analyzing stock {stock.get('ticker', 'unknown')}: {e}")
-            stock["analysis"] = "Analysis error: Could not generate analysis."
+            logger.error("Error analyzing stock %s: %s", stock.get("ticker", "unknown"), e)
+            results.append({
+                "ticker": stock.get("ticker", "unknown"),
+                "analysis": "Analysis error: Could not generate analysis.",
+            })
 
     # Save analyses to file
     if stocks_analyzed:
         save_analyses_to_file(stocks_analyzed, screener_name, analysis_file_prefix)
 
+    return results
+
+
+# Persistent event loop for Telegram sends, created on first use and shared
+# for the life of the process. Reusing one loop (instead of asyncio.run per
+# send) skips loop setup/teardown on every notification and lets the bot's
+# HTTP machinery keep its connections warm across scheduled runs.
+_NOTIFY_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_NOTIFY_LOOP_LOCK = threading.Lock()
+
+# Futures for sends still in flight; flushed at interpreter exit so the
+# daemon notifier thread can't be killed mid-send
+_PENDING_NOTIFY_FUTURES: List[Future] = []
+
+
+def _get_notify_loop() -> asyncio.AbstractEventLoop:
+    global _NOTIFY_LOOP
+    with _NOTIFY_LOOP_LOCK:
+        if _NOTIFY_LOOP is None:
+            _NOTIFY_LOOP = asyncio.new_event_loop()
+            threading.Thread(
+                target=_NOTIFY_LOOP.run_forever, name="telegram-notify", daemon=True
+            ).start()
+    return _NOTIFY_LOOP
+
+
+def _send_telegram_in_background(summary: str) -> None:
+    """Send the Telegram summary on the shared notifier loop.
+
+    The notification is pure network I/O and nothing downstream depends on
+    it, so scheduling it onto the background loop means callers of
+    analyze_stocks don't wait out the Telegram round-trip, and it can't
+    clash with any event loop running in the caller.
+    """
+    async def _send():
+        try:
+            logger.info("Sending analysis summary via Telegram...")
+            await send_telegram_message(summary)
+            logger.info("Telegram notification sent successfully.")
+        except Exception as telegram_err:
+            logger.error("Failed to send Telegram notification: %s", telegram_err)
+
+    _PENDING_NOTIFY_FUTURES.append(
+        asyncio.run_coroutine_threadsafe(_send(), _get_notify_loop())
+    )
+
+
+@atexit.register
+def _flush_pending_notifications() -> None:
+    """Wait (bounded) for in-flight Telegram sends before interpreter exit.
+
+    The notifier loop runs on a daemon thread, so without this a summary
+    scheduled moments before main() returns would be killed mid-flight
+    and silently lost.
+    """
+    for future in _PENDING_NOTIFY_FUTURES:
+        try:
+            future.result(timeout=30)
+        except Exception:
+            pass  # _send() already logs its own failures
+
 
 def save_analyses_to_file(stocks: List[Dict[str, Any]], screener_name: str, file_prefix: str) -> None:
     """
@@ -354,66 +965,68 @@ def save_analyses_to_file(stocks: List[Dict[str, Any]], screener_name: str, file
         file_prefix: Prefix for the output file (e.g., "penny_stocks", "normal_stocks").
     """
     try:
-        # Create results directory if it doesn't exist
-        settings.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        # Create results directory if it doesn't exist (cached check)
+        ensure_dir(settings.RESULTS_DIR)
 
-        # Generate filename with timestamp and prefix
-        timestamp = datetime.now().strftime("%Y-%m-%d")
+        # Generate filename with timestamp and prefix. date.today().isoformat()
+        # yields the same YYYY-MM-DD string as now().strftime without the
+        # time component or format parsing.
+        timestamp = date.today().isoformat()
         filename = settings.RESULTS_DIR / f"{file_prefix}_analysis_{timestamp}.md"
 
-        markdown_content = f"# {screener_name} Analysis\n\n"
         # Escape timestamp for Telegram summary header
         escaped_timestamp = escape_markdown(timestamp)
-        telegram_summary = f"*{screener_name} Analysis - {escaped_timestamp}*\n\n"
-        telegram_summary += f"Found {len(stocks)} stocks matching criteria:\n\n"
+        # Only the short Telegram summary is accumulated in memory; the
+        # markdown document streams straight to disk per stock, so peak
+        # memory is bounded by one analysis rather than all of them.
+        tg_parts = [
+            f"*{screener_name} Analysis - {escaped_timestamp}*\n\n",
+            f"Found {len(stocks)} stocks matching criteria:\n\n",
+        ]
 
-        for stock in stocks:
-            ticker = stock.get("ticker", "unknown")
-            company_name = stock.get("company_name", "")
-            analysis = stock.get("analysis", "No analysis available.")
-            recommendation = "Recommendation: Not Found"  # Default
+        # Binary mode skips the text-layer newline translation and codec
+        # state machine; the large buffer keeps the per-stock writes from
+        # hitting the disk one fragment at a time.
+        with open(filename, "wb", buffering=1 << 20) as f:
+            f.write(f"# {screener_name} Analysis\n\n".encode("utf-8"))
 
-            # Improved recommendation extraction
-            lines = analysis.split('\n')
-            try:
-                idx = next(i for i, line in enumerate(lines) if "recommendation" in line.lower())
-                recommendation_line = next((lines[j].strip() for j in range(idx + 1, len(lines)) if lines[j].strip()), None)
-                if recommendation_line:
+            for stock in stocks:
+                ticker = stock.get("ticker", "unknown")
+                company_name = stock.get("company_name", "")
+                analysis = stock.get("analysis", "No analysis available.")
+
+                # Improved recommendation extraction (single compiled-regex
+                # pass); only a found stance needs escaping, the fallback is
+                # pre-escaped at import
+                escaped_recommendation = _TG_REC_NOT_FOUND
+                match = RECOMMENDATION_RE.search(analysis)
+                if match:
+                    recommendation_line = match.group(1).strip()
                     if not recommendation_line.lower().startswith("recommendation"):
-                         recommendation = f"Recommendation: {recommendation_line}"
+                        recommendation = f"Recommendation: {recommendation_line}"
                     else:
-                         recommendation = recommendation_line
-            except StopIteration:
-                pass
-
-            ticker_display = f"## {ticker}"
-            if company_name:
-                ticker_display += f" - {company_name}"
+                        recommendation = recommendation_line
+                    escaped_recommendation = escape_markdown(recommendation)
 
-            markdown_content += f"{ticker_display}\n\n{analysis}\n\n---\n\n"
+                ticker_display = f"## {ticker}"
+                if company_name:
+                    ticker_display += f" - {company_name}"
 
-            escaped_ticker = escape_markdown(ticker)
-            escaped_recommendation = escape_markdown(recommendation)
-            telegram_summary += f"- *{escaped_ticker}*: {escaped_recommendation}\n"
+                f.write(f"{ticker_display}\n\n{analysis}\n\n---\n\n".encode("utf-8"))
 
-        # --- Send Telegram Notification ---
-        try:
-            max_len = 4000
-            if len(telegram_summary) > max_len:
-                telegram_summary = telegram_summary[:max_len] + "... (truncated)"
+                escaped_ticker = escape_markdown(ticker)
+                tg_parts.append(f"- *{escaped_ticker}*: {escaped_recommendation}\n")
 
-            logger.info("Sending analysis summary via Telegram...")
-            asyncio.run(send_telegram_message(telegram_summary))
-            logger.info("Telegram notification sent successfully.")
-        except Exception as telegram_err:
-            logger.error(f"Failed to send Telegram notification: {telegram_err}")
-        # ---------------------------------
+        telegram_summary = "".join(tg_parts)
 
-        # Write analyses to file
-        with open(filename, "w") as f:
-            f.write(markdown_content)
+        logger.info("Analyses saved to %s", filename)
 
-        logger.info(f"Analyses saved to {filename}")
+        # --- Send Telegram Notification (off the critical path) ---
+        max_len = 4000
+        if len(telegram_summary) > max_len:
+            telegram_summary = telegram_summary[:max_len] + "... (truncated)"
+        _send_telegram_in_background(telegram_summary)
+        # ----------------------------------------------------------
 
     except Exception as e:
-        logger.error(f"Error saving analyses to file: {e}")
+        logger.error("Error saving analyses to file: %s", e)
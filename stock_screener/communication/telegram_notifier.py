@@ -1,9 +1,14 @@
 import os
 import telegram
 import asyncio
-import re # Import re for escaping
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_fixed
+
+try:
+    # Available in python-telegram-bot v20+; lets the Bot keep a pooled
+    # httpx client instead of opening a fresh connection per message.
+    from telegram.request import HTTPXRequest
+except ImportError:
+    HTTPXRequest = None
 
 # Load environment variables
 load_dotenv()
@@ -17,8 +22,20 @@ if not TELEGRAM_BOT_TOKEN:
 if not TELEGRAM_CHAT_ID:
     raise ValueError("TELEGRAM_CHAT_ID environment variable not set.")
 
-# Initialize the bot
-bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
+# Initialize the bot once, with a persistent connection pool when the
+# library supports it, so bursts of messages reuse warm HTTPS connections
+if HTTPXRequest is not None:
+    bot = telegram.Bot(
+        token=TELEGRAM_BOT_TOKEN,
+        request=HTTPXRequest(connection_pool_size=8, pool_timeout=5.0),
+    )
+else:
+    bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
+
+# Translation table for basic Markdown escaping, built once at import.
+# str.translate does the whole pass in C — no regex engine and no per-call
+# pattern work, which matters when escaping runs per stock in the summaries.
+_MD_ESCAPE_TABLE = str.maketrans({c: "\\" + c for c in "_*`["})
 
 def escape_markdown(text: str) -> str:
     """
@@ -29,15 +46,13 @@ def escape_markdown(text: str) -> str:
     """
     if not isinstance(text, str):
         return ""
-    # Only escape specific characters required for basic Markdown
-    escape_chars = r'([_*`\[])' # Escape _, *, `, and [
-    return re.sub(escape_chars, r'\\\1', text)
+    return text.translate(_MD_ESCAPE_TABLE)
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
 async def send_telegram_message(message: str):
     """
     Sends a message to the specified Telegram chat ID.
-    Retries up to 3 times with a 2-second delay if sending fails.
+    Retries up to 3 times; on rate limits it sleeps for exactly the
+    Retry-After duration Telegram reports instead of a fixed delay.
 
     Args:
         message: The text message to send (should be pre-escaped if needed).
@@ -46,13 +61,22 @@ async def send_telegram_message(message: str):
         print("Error: Invalid message content.")
         return
 
-    try:
-        print(f"Attempting to send message to chat ID {TELEGRAM_CHAT_ID}...")
-        await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message, parse_mode='Markdown')
-        print("Message sent successfully.")
-    except telegram.error.TelegramError as e:
-        print(f"Error sending Telegram message: {e}")
-        raise # Reraise the exception to trigger tenacity retry
+    for attempt in range(1, 4):
+        try:
+            print(f"Attempting to send message to chat ID {TELEGRAM_CHAT_ID}...")
+            await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message, parse_mode='Markdown')
+            print("Message sent successfully.")
+            return
+        except telegram.error.RetryAfter as e:
+            print(f"Rate limited by Telegram, retrying in {e.retry_after}s...")
+            if attempt == 3:
+                raise
+            await asyncio.sleep(e.retry_after)
+        except telegram.error.TelegramError as e:
+            print(f"Error sending Telegram message: {e}")
+            if attempt == 3:
+                raise
+            await asyncio.sleep(2)
 
 # Example usage (for testing purposes)
 async def main():
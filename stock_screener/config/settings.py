@@ -106,6 +106,7 @@ CACHE_EXPIRY = 3600  # Cache expiry in seconds (1 hour)
 RSI_PERIOD = 14
 SMA_FAST = 50
 SMA_SLOW = 200
+SMA_PERIODS = (20, 50, 200)
 VOLUME_MA_PERIOD = 20
 
 # --- Risk Management Settings ---
@@ -148,9 +149,4 @@ TECHNICAL_WEIGHT = 0.4
 FUNDAMENTAL_WEIGHT = 0.3
 SENTIMENT_WEIGHT = 0.3
 
-# Technical parameters
-RSI_PERIOD = 14
-SMA_PERIODS = [20, 50, 200]
-VOLUME_MA_PERIOD = 20
-
 # News API Settings removed
@@ -4,7 +4,6 @@ Simple Yahoo Finance integration for stock screening.
 
 import yfinance as yf
 import logging
-import time
 from functools import lru_cache
 from typing import List, Dict, Any
 from tenacity import (
@@ -19,7 +18,6 @@ from datetime import datetime
 import pandas as pd
 import pandas_ta as ta
 import numpy as np
-import stock_screener.config.settings as settings # Ensure settings is imported
 
 # Configure logging
 logging.basicConfig(
@@ -146,38 +144,34 @@ NORMAL_STOCKS_LIST = list(
 )
 
 
+def _latest_close_prices(tickers: List[str]) -> pd.Series:
+    """Fetch the latest close for many tickers in one batched download.
+
+    A single yf.download call replaces the old per-ticker
+    Ticker().history() loop and its politeness sleeps; delisted or
+    unpriced symbols simply come back as NaN and are dropped.
+    """
+    data = yf.download(tickers, period="1d", group_by="column", progress=False)
+    closes = data["Close"]
+    if isinstance(closes, pd.Series):
+        # Single-ticker downloads have no ticker column level
+        closes = closes.to_frame(name=tickers[0])
+    return closes.iloc[-1].dropna()
+
+
 def get_potential_penny_stocks() -> List[str]: # Renamed from get_penny_stocks
     """Get a list of potential penny stocks based on a predefined list and price < $5."""
     logger.info("Starting potential penny stock identification")
-    potential_stocks = []
-
-    # Use our expanded predefined list
-    for i, ticker in enumerate(PENNY_STOCKS_LIST):
-        try:
-            # Add delay every 3 requests
-            if i > 0 and i % 3 == 0:
-                time.sleep(0.5)
-
-            # Get stock info
-            logger.info(f"Checking {ticker} for penny stock potential...")
-            stock = yf.Ticker(ticker)
 
-            try:
-                # Try to get the current price
-                hist = stock.history(period="1d")
-                if not hist.empty:
-                    price = hist["Close"].iloc[-1]
-                    # Use PRICE_MAX from settings
-                    if 0 < price < settings.PRICE_MAX:
-                        potential_stocks.append(ticker)
-                        logger.info(f"Identified potential penny stock: {ticker} (${price:.2f})")
-            except Exception as e:
-                # Don't log error if it's a known delisted symbol pattern
-                if "No data found, symbol may be delisted" not in str(e):
-                     logger.warning(f"Error getting history for {ticker}: {e}")
+    try:
+        closes = _latest_close_prices(PENNY_STOCKS_LIST)
+    except Exception as e:
+        logger.warning(f"Batched price download failed: {e}")
+        return []
 
-        except Exception as e:
-            logger.warning(f"Error processing {ticker}: {e}")
+    # Use PRICE_MAX from settings; one boolean mask instead of per-row checks
+    mask = (closes > 0) & (closes < settings.PRICE_MAX)
+    potential_stocks = closes.index[mask].tolist()
 
     logger.info(f"Found {len(potential_stocks)} potential penny stocks")
     return potential_stocks
@@ -186,34 +180,16 @@ def get_potential_penny_stocks() -> List[str]: # Renamed from get_penny_stocks
 def get_potential_normal_stocks() -> List[str]:
     """Get a list of potential normal stocks based on a predefined list and price >= NORMAL_STOCK_PRICE_MIN."""
     logger.info("Starting potential normal stock identification")
-    potential_stocks = []
-
-    # Use our normal stock list
-    for i, ticker in enumerate(NORMAL_STOCKS_LIST):
-        try:
-            # Add delay every 3 requests
-            if i > 0 and i % 3 == 0:
-                time.sleep(0.5)
-
-            # Get stock info
-            logger.info(f"Checking {ticker} for normal stock potential...")
-            stock = yf.Ticker(ticker)
 
-            try:
-                # Try to get the current price
-                hist = stock.history(period="1d")
-                if not hist.empty:
-                    price = hist["Close"].iloc[-1]
-                    # Use NORMAL_STOCK_PRICE_MIN from settings
-                    if price >= settings.NORMAL_STOCK_PRICE_MIN:
-                        potential_stocks.append(ticker)
-                        logger.info(f"Identified potential normal stock: {ticker} (${price:.2f})")
-            except Exception as e:
-                if "No data found, symbol may be delisted" not in str(e):
-                     logger.warning(f"Error getting history for {ticker}: {e}")
+    try:
+        closes = _latest_close_prices(NORMAL_STOCKS_LIST)
+    except Exception as e:
+        logger.warning(f"Batched price download failed: {e}")
+        return []
 
-        except Exception as e:
-            logger.warning(f"Error processing {ticker}: {e}")
+    # Use NORMAL_STOCK_PRICE_MIN from settings
+    mask = closes >= settings.NORMAL_STOCK_PRICE_MIN
+    potential_stocks = closes.index[mask].tolist()
 
     logger.info(f"Found {len(potential_stocks)} potential normal stocks")
     return potential_stocks
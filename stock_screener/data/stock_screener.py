@@ -4,6 +4,7 @@ Module for screening stocks based on financial metrics.
 
 import logging
 import time
+from bisect import bisect_left, bisect_right
 from typing import List, Dict, Any
 from .simple_yahoo import (
     # get_penny_stocks, # This was renamed
@@ -28,6 +29,38 @@ logger = logging.getLogger(__name__)
 # Import settings for risk filters
 from ..config import settings
 
+# --- Scoring lookup tables --- #
+# Built once from the settings dicts so calculate_stock_score does a bisect
+# into a sorted tuple per metric instead of walking an if/elif ladder (and
+# no longer re-imports settings on every call). Thresholds ascend; the
+# points tuple has one extra slot for values beyond the last threshold.
+_PRICE_TIERS = sorted(
+    (c["threshold"], c["points"]) for c in settings.PRICE_SCORE_THRESHOLDS.values()
+)
+_PRICE_THRESH = tuple(t for t, _ in _PRICE_TIERS)
+_PRICE_PTS = tuple(p for _, p in _PRICE_TIERS) + (0,)
+
+_VOLUME_TIERS = sorted(
+    (c["threshold"], c["points"]) for c in settings.VOLUME_RATIO_THRESHOLDS.values()
+)
+_VOLUME_THRESH = tuple(t for t, _ in _VOLUME_TIERS)
+_VOLUME_PTS = (0,) + tuple(p for _, p in _VOLUME_TIERS)
+
+_OPTIONS_THRESH = (
+    settings.OPTIONS_RATIO_THRESHOLDS["BULLISH"]["threshold"],
+    settings.OPTIONS_RATIO_THRESHOLDS["NEUTRAL"]["threshold"],
+)
+_OPTIONS_PTS = (
+    settings.OPTIONS_RATIO_THRESHOLDS["BULLISH"]["points"],
+    settings.OPTIONS_RATIO_THRESHOLDS["NEUTRAL"]["points"],
+    0,
+)
+_OPTIONS_BEARISH_THRESH = settings.OPTIONS_RATIO_THRESHOLDS["BEARISH"]["threshold"]
+_OPTIONS_BEARISH_PTS = settings.OPTIONS_RATIO_THRESHOLDS["BEARISH"]["points"]
+
+_PE_POINTS = settings.SCORE_WEIGHTS["PE_SCORE"]
+_MAX_RAW_SCORE = sum(settings.SCORE_WEIGHTS.values())
+
 def screen_penny_stocks(
     min_score: float = 7.0, max_stocks: int = 20
 ) -> List[Dict[str, Any]]:
@@ -166,21 +199,13 @@ def calculate_stock_score(stock_data: Dict[str, Any]) -> float:
             return 0
 
         # --- Scoring Criteria --- #
-        from ..config.settings import (
-            SCORE_WEIGHTS, PRICE_SCORE_THRESHOLDS,
-            VOLUME_RATIO_THRESHOLDS, PE_RATIO_THRESHOLD,
-            OPTIONS_RATIO_THRESHOLDS
-        )
+        # Each metric indexes the module-level points table via bisect:
+        # bisect_right matches the strict < ladders, bisect_left the strict >
 
         # Price scoring
         price = stock_data.get("price")
         if price is not None:
-            if price < PRICE_SCORE_THRESHOLDS["HIGH"]["threshold"]:
-                score += PRICE_SCORE_THRESHOLDS["HIGH"]["points"]
-            elif price < PRICE_SCORE_THRESHOLDS["MEDIUM"]["threshold"]:
-                score += PRICE_SCORE_THRESHOLDS["MEDIUM"]["points"]
-            elif price < PRICE_SCORE_THRESHOLDS["LOW"]["threshold"]:
-                score += PRICE_SCORE_THRESHOLDS["LOW"]["points"]
+            score += _PRICE_PTS[bisect_right(_PRICE_THRESH, price)]
         else:
             logger.debug(f"No price for {ticker} scoring")
 
@@ -188,24 +213,15 @@ def calculate_stock_score(stock_data: Dict[str, Any]) -> float:
         volume = stock_data.get("volume")
         avg_volume = stock_data.get("avg_volume")
         if volume is not None and avg_volume is not None and avg_volume > 10000:
-            try:
-                vol_ratio = volume / avg_volume
-                if vol_ratio > VOLUME_RATIO_THRESHOLDS["HIGH"]["threshold"]:
-                    score += VOLUME_RATIO_THRESHOLDS["HIGH"]["points"]
-                elif vol_ratio > VOLUME_RATIO_THRESHOLDS["MEDIUM"]["threshold"]:
-                    score += VOLUME_RATIO_THRESHOLDS["MEDIUM"]["points"]
-                elif vol_ratio > VOLUME_RATIO_THRESHOLDS["LOW"]["threshold"]:
-                    score += VOLUME_RATIO_THRESHOLDS["LOW"]["points"]
-            except ZeroDivisionError:
-                logger.debug(f"Zero avg volume for {ticker}")
+            score += _VOLUME_PTS[bisect_left(_VOLUME_THRESH, volume / avg_volume)]
         else:
             logger.debug(f"Insufficient volume data for {ticker} scoring")
 
         # P/E Ratio scoring
         pe = stock_data.get("pe_ratio")
         if pe is not None and pe > 0:
-            if pe < PE_RATIO_THRESHOLD:
-                score += SCORE_WEIGHTS["PE_SCORE"]
+            if pe < settings.PE_RATIO_THRESHOLD:
+                score += _PE_POINTS
         else:
             logger.debug(f"No P/E for {ticker} scoring")
 
@@ -217,12 +233,11 @@ def calculate_stock_score(stock_data: Dict[str, Any]) -> float:
             ratio_to_use = pc_oi_ratio if pc_oi_ratio is not None else pc_vol_ratio
 
             if ratio_to_use is not None:
-                if ratio_to_use < OPTIONS_RATIO_THRESHOLDS["BULLISH"]["threshold"]:
-                    score += OPTIONS_RATIO_THRESHOLDS["BULLISH"]["points"]
-                elif ratio_to_use < OPTIONS_RATIO_THRESHOLDS["NEUTRAL"]["threshold"]:
-                    score += OPTIONS_RATIO_THRESHOLDS["NEUTRAL"]["points"]
-                elif ratio_to_use > OPTIONS_RATIO_THRESHOLDS["BEARISH"]["threshold"]:
-                    score += OPTIONS_RATIO_THRESHOLDS["BEARISH"]["points"]
+                score += _OPTIONS_PTS[bisect_right(_OPTIONS_THRESH, ratio_to_use)]
+                # Bearish penalty compares the opposite direction (>), so it
+                # stays a separate check rather than joining the bisect table
+                if ratio_to_use > _OPTIONS_BEARISH_THRESH:
+                    score += _OPTIONS_BEARISH_PTS
                 ratio_str = f"{ratio_to_use:.2f}"
                 logger.debug(f"Options ratio score: {ticker} Ratio={ratio_str}")
             else:
@@ -231,8 +246,7 @@ def calculate_stock_score(stock_data: Dict[str, Any]) -> float:
             logger.debug(f"No options metrics for {ticker}")
 
         # --- Normalization --- #
-        max_possible_score = sum(SCORE_WEIGHTS.values())
-        normalized_score = (score / max_possible_score) * 10 if max_possible_score > 0 else 0
+        normalized_score = (score / _MAX_RAW_SCORE) * 10 if _MAX_RAW_SCORE > 0 else 0
 
         logger.debug(
             f"Score for {ticker}: Raw={score}, Norm={normalized_score:.2f}"
@@ -6,7 +6,7 @@ import logging
 import argparse # Import argparse
 from .config import settings
 from .data.stock_screener import screen_penny_stocks, screen_normal_stocks # Import both screeners
-from .analysis.ai_analyzer import analyze_stocks
+from .analysis.ai_analyzer import analyze_stocks, preload_model
 from .utils.helpers import save_investment_summary
 
 # Set up logging
@@ -43,6 +43,10 @@ def main():
 
     logger.info(f"Starting {screener_type} stock screener...")
 
+    # Kick off the Ollama model load now so it overlaps the (slow)
+    # data-fetch/screening phase below instead of delaying the first analysis
+    preload_model()
+
     screened_stocks = []
     screener_name = ""
     analysis_file_prefix = ""
@@ -69,7 +73,13 @@ def main():
     logger.info(
         f"Generating detailed analysis for top {len(screened_stocks)} {screener_type} stocks..."
     )
-    analyze_stocks(screened_stocks, screener_name, analysis_file_prefix)
+    analysis_results = analyze_stocks(screened_stocks, screener_name, analysis_file_prefix)
+
+    # Merge the analyses back into our own dicts for the summary below
+    analysis_by_ticker = {r["ticker"]: r["analysis"] for r in analysis_results}
+    for stock in screened_stocks:
+        if stock.get("ticker") in analysis_by_ticker:
+            stock["analysis"] = analysis_by_ticker[stock["ticker"]]
 
     # Save summary (pass prefix to potentially use in filename later)
     logger.info(f"Saving {screener_type} investment summary...")
@@ -11,6 +11,11 @@ from pathlib import Path
 from datetime import datetime
 from ..config import settings
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +27,20 @@ def setup_logging():
     return logging.getLogger(__name__)
 
 
+# Directories already created this process; lets ensure_dir skip the
+# stat/mkdir syscalls the save helpers would otherwise repeat per batch.
+_ENSURED_DIRS = set()
+
+
+def ensure_dir(path) -> Path:
+    """Create a directory (with parents) once per process and return it."""
+    path = Path(path)
+    if path not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+    return path
+
+
 def convert_to_float(value):
     """Convert a value to float, handling various formats."""
     if value is None:
@@ -56,6 +75,24 @@ class NumpyJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def write_json_file(path, data: Any, indent: int = 2) -> None:
+    """Serialize data to a JSON file, preferring orjson when installed.
+
+    orjson serializes numpy types natively (OPT_SERIALIZE_NUMPY) and is
+    several times faster than stdlib json; NaN/Inf become null. Without
+    orjson this falls back to json.dump with NumpyJSONEncoder.
+    """
+    path = Path(path)
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        path.write_bytes(orjson.dumps(data, option=option, default=str))
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, cls=NumpyJSONEncoder, indent=indent)
+
+
 def save_json(filename_prefix: str, data: Any, logger: logging.Logger) -> None:
     """Save data to a JSON file in the results directory, handling numpy types."""
 
@@ -88,10 +125,15 @@ def save_json(filename_prefix: str, data: Any, logger: logging.Logger) -> None:
     output_path = settings.RESULTS_DIR / output_filename
 
     try:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        converted_data = convert_numpy_types(data)
-        with open(output_path, "w") as f:
-            json.dump(converted_data, f, indent=4)
+        ensure_dir(output_path.parent)
+        if orjson is not None:
+            # orjson handles numpy scalars/arrays natively, so the recursive
+            # conversion pass is only needed on the stdlib fallback
+            write_json_file(output_path, data, indent=4)
+        else:
+            converted_data = convert_numpy_types(data)
+            with open(output_path, "w") as f:
+                json.dump(converted_data, f, indent=4)
         logger.info(f"Data saved to {output_path}")
     except TypeError as e:
         logger.error(f"Error: Data is not JSON serializable for {output_filename}. {e}")
@@ -109,7 +151,7 @@ def save_selected_tickers(tickers_data):
 
     try:
         # Ensure the directory exists
-        tickers_file.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(tickers_file.parent)
 
         # Save tickers data
         with open(tickers_file, "w") as f:
@@ -139,7 +181,7 @@ def save_investment_summary(top_stocks: List[Dict[str, Any]], file_prefix: str)
 
     try:
         # Ensure the directory exists
-        summary_file.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(summary_file.parent)
 
         # Determine a user-friendly title based on prefix
         summary_title = "Investment Opportunities Summary"
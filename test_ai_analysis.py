@@ -40,20 +40,18 @@ def test_analyze_single_stock():
         test_stock = SAMPLE_STOCKS[0]
         logger.info(f"Analyzing {test_stock['ticker']}...")
 
-        # Create a copy of the stock to avoid modifying the original
-        test_stock_copy = test_stock.copy()
-
         try:
-            analyze_stocks([test_stock_copy])
-
-            # Check if analysis was added
-            if "analysis" in test_stock_copy:
-                logger.info(f"Analysis result for {test_stock_copy['ticker']}:")
-                logger.info(test_stock_copy["analysis"])
+            # analyze_stocks no longer mutates its input; consume the
+            # returned [{"ticker", "analysis"}] list instead
+            results = analyze_stocks([test_stock])
+            analysis_by_ticker = {r["ticker"]: r["analysis"] for r in results}
+
+            ticker = test_stock["ticker"]
+            if ticker in analysis_by_ticker:
+                logger.info(f"Analysis result for {ticker}:")
+                logger.info(analysis_by_ticker[ticker])
             else:
-                logger.warning(
-                    f"No analysis was generated for {test_stock_copy['ticker']}"
-                )
+                logger.warning(f"No analysis was generated for {ticker}")
 
         except Exception as e:
             logger.error(f"Error analyzing {test_stock['ticker']}: {e}")
@@ -69,10 +67,9 @@ def test_analyze_multiple_stocks():
     test_stocks = SAMPLE_STOCKS[:2].copy()
 
     try:
-        # Create copies to avoid modifying the originals
-        test_stocks_copy = [stock.copy() for stock in test_stocks]
-
-        analyze_stocks(test_stocks_copy)
+        # analyze_stocks returns the analyses without touching the inputs
+        analysis_results = analyze_stocks(test_stocks)
+        analysis_by_ticker = {r["ticker"]: r["analysis"] for r in analysis_results}
 
         # Save results to a file
         results_dir = Path("test_results")
@@ -85,14 +82,14 @@ def test_analyze_multiple_stocks():
         with open(result_file, "w") as f:
             # Keep only what we need to avoid errors with non-serializable objects
             simplified_results = []
-            for stock in test_stocks_copy:
+            for stock in test_stocks:
                 simplified_stock = {
                     "ticker": stock["ticker"],
                     "price": stock["price"],
                     "company_name": stock.get("company_name", "Unknown"),
                 }
-                if "analysis" in stock:
-                    simplified_stock["analysis"] = stock["analysis"]
+                if stock["ticker"] in analysis_by_ticker:
+                    simplified_stock["analysis"] = analysis_by_ticker[stock["ticker"]]
                 simplified_results.append(simplified_stock)
 
             json.dump(simplified_results, f, indent=2)